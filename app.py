@@ -2,10 +2,12 @@
 Email Task Extractor - Web Application
 User-friendly interface for extracting tasks from emails
 """
+import io
 import streamlit as st
-import json
+from collections import deque
 from datetime import datetime
-from task_extractor import process_email
+from task_extractor import (process_email, process_emails_parallel,
+                            combine_results, json_dumps, json_loads)
 import pandas as pd
 
 # Page configuration
@@ -16,6 +18,18 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Opt-in profiling: open the app with ?profile=1 to get a pyinstrument
+# report of the full script run rendered at the bottom of the page
+_profiler = None
+if st.query_params.get("profile") == "1":
+    try:
+        from pyinstrument import Profiler
+        _profiler = Profiler()
+        _profiler.start()
+    except ImportError:
+        st.warning("⚠️ Profiling requested but pyinstrument is not installed "
+                   "(pip install pyinstrument)")
+
 # Custom CSS for better styling
 st.markdown("""
     <style>
@@ -50,11 +64,124 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Initialize session state
+# Initialize session state; history is a bounded ring buffer with running
+# counters so sidebar stats stay O(1) and memory doesn't grow unbounded
+HISTORY_MAXLEN = 100
+
 if 'processed_tasks' not in st.session_state:
     st.session_state.processed_tasks = None
 if 'extraction_history' not in st.session_state:
-    st.session_state.extraction_history = []
+    st.session_state.extraction_history = deque(maxlen=HISTORY_MAXLEN)
+if 'history_email_count' not in st.session_state:
+    st.session_state.history_email_count = 0
+if 'history_task_count' not in st.session_state:
+    st.session_state.history_task_count = 0
+
+# Refuse uploads bigger than this rather than ballooning memory; an email
+# this large is almost certainly a mailbox archive, not a single message
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+
+
+def read_uploaded_email(uploaded_file):
+    """Decode an uploaded email in bounded chunks; None if too large"""
+    if uploaded_file.size > MAX_UPLOAD_BYTES:
+        st.warning(f"⚠️ Skipping {uploaded_file.name}: larger than "
+                   f"{MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+        return None
+    reader = io.TextIOWrapper(uploaded_file, encoding='utf-8')
+    return ''.join(iter(lambda: reader.read(65536), ''))
+
+
+@st.cache_data(show_spinner=False)
+def build_exports(result_json):
+    """Build the JSON/CSV/Markdown export payloads once per result
+
+    Keyed on a compact JSON dump of the result so hovering sliders or
+    editing tasks doesn't redo DataFrame construction and serialization.
+    The pretty-printed (indent=2) JSON is only materialized here.
+    """
+    result = json_loads(result_json)
+    tasks = result['processed_tasks']
+
+    json_data = json_dumps(result, indent=True)
+
+    # Columnar construction skips Pandas' row-wise schema inference
+    tasks_df = pd.DataFrame({
+        'Task': [t['task_description'] for t in tasks],
+        'Assignee': [t['assignee'] for t in tasks],
+        'Deadline': [t.get('deadline', '') for t in tasks],
+        'Priority': [t['priority'] for t in tasks],
+        'Confidence': [f"{t['confidence_metrics']['final_confidence']:.2f}" for t in tasks],
+        'Status': [t['review_status'] for t in tasks]
+    }, copy=False)
+    csv_data = tasks_df.to_csv(index=False)
+
+    markdown_output = "# Extracted Tasks\n\n"
+    for i, task in enumerate(tasks, 1):
+        markdown_output += f"## Task {i}: {task['task_description']}\n"
+        markdown_output += f"- **Assignee:** {task['assignee']}\n"
+        markdown_output += f"- **Deadline:** {task.get('deadline', 'TBD')}\n"
+        markdown_output += f"- **Priority:** {task['priority']}\n"
+        markdown_output += f"- **Confidence:** {task['confidence_metrics']['final_confidence']:.0%}\n\n"
+
+    return json_data, csv_data, markdown_output
+
+
+@st.fragment
+def render_task(i, task, confidence_threshold):
+    """Render one task's expander/edit UI; reruns in isolation on edit"""
+    confidence = task['confidence_metrics']['final_confidence']
+
+    # Color-coded container based on confidence
+    if confidence >= confidence_threshold:
+        emoji = "🟢"
+        status = "Auto-Approved"
+    elif confidence >= 0.5:
+        emoji = "🟡"
+        status = "Needs Review"
+    else:
+        emoji = "🔴"
+        status = "Urgent Review"
+
+    with st.expander(f"{emoji} Task {i}: {task['task_description']}", expanded=True):
+        # Task details
+        col_a, col_b, col_c = st.columns(3)
+
+        with col_a:
+            st.markdown(f"**Assignee:**")
+            st.text(task['assignee'])
+
+        with col_b:
+            st.markdown(f"**Deadline:**")
+            st.text(task.get('deadline', 'Not specified'))
+
+        with col_c:
+            st.markdown(f"**Priority:**")
+            st.text(task['priority'].title())
+
+        # Confidence details
+        st.markdown(f"**Confidence:** {confidence:.0%} ({status})")
+        st.progress(confidence)
+
+        # Show reasoning
+        with st.expander("🔍 AI Reasoning"):
+            st.info(task.get('reasoning', 'No reasoning provided'))
+
+            if task['confidence_metrics']['adjustments']:
+                st.warning("Adjustments: " + ", ".join(task['confidence_metrics']['adjustments']))
+
+        # Edit options
+        with st.form(f"edit_form_{i}"):
+            st.markdown("**Edit Task:**")
+            edited_desc = st.text_input("Description", value=task['task_description'])
+            edited_assignee = st.text_input("Assignee", value=task['assignee'])
+            edited_deadline = st.text_input("Deadline", value=task.get('deadline', ''))
+            edited_priority = st.selectbox("Priority", ['high', 'medium', 'low'],
+                                           index=['high', 'medium', 'low'].index(task['priority']))
+
+            if st.form_submit_button("✅ Update Task"):
+                st.success("Task updated! (In production, this would save to database)")
+
 
 # Header
 st.title("📧 AI Email Task Extractor")
@@ -77,11 +204,9 @@ with st.sidebar:
     st.markdown("---")
     
     st.header("📊 Stats")
-    if st.session_state.extraction_history:
-        total_emails = len(st.session_state.extraction_history)
-        total_tasks = sum(len(e['tasks']) for e in st.session_state.extraction_history)
-        st.metric("Emails Processed", total_emails)
-        st.metric("Total Tasks Extracted", total_tasks)
+    if st.session_state.history_email_count:
+        st.metric("Emails Processed", st.session_state.history_email_count)
+        st.metric("Total Tasks Extracted", st.session_state.history_task_count)
     else:
         st.info("No emails processed yet")
     
@@ -100,10 +225,14 @@ with st.sidebar:
     - 🔴 Low (<0.5): Urgent review
     """)
     
+    # The button click already triggers a rerun; calling st.rerun() here
+    # would immediately run the whole script a second time
     if st.button("🗑️ Clear History"):
-        st.session_state.extraction_history = []
+        st.session_state.extraction_history.clear()
+        st.session_state.history_email_count = 0
+        st.session_state.history_task_count = 0
         st.session_state.processed_tasks = None
-        st.rerun()
+        st.toast("History cleared")
 
 # Main content area
 col1, col2 = st.columns([1, 1])
@@ -111,37 +240,45 @@ col1, col2 = st.columns([1, 1])
 with col1:
     st.header("📥 Input Email")
     
-    # Tab for different input methods
-    input_tab1, input_tab2 = st.tabs(["✍️ Paste Email", "📁 Upload File"])
-    
-    with input_tab1:
-        email_text = st.text_area(
-            "Email Content",
-            height=300,
-            placeholder="Paste your email here...\n\nExample:\nHi team,\nSarah - please finish the Q1 report by March 15th.\nJohn should review the code by end of week.\n...",
-            help="Copy and paste the full email body"
-        )
-        
-        sender = st.text_input(
-            "From (optional)",
-            placeholder="sender@company.com",
-            help="Email sender - helps with context"
-        )
-    
-    with input_tab2:
-        uploaded_file = st.file_uploader(
-            "Upload email file (.txt, .eml)",
-            type=['txt', 'eml'],
-            help="Upload a text file containing the email"
-        )
-        
-        if uploaded_file:
-            email_text = uploaded_file.read().decode('utf-8')
-            st.text_area("Preview", email_text, height=200, disabled=True)
-            sender = st.text_input("From (optional)", key="file_sender")
-    
-    # Extract button
-    extract_button = st.button("🚀 Extract Tasks", type="primary", use_container_width=True)
+    uploaded_texts = []
+
+    # Form defers reruns until submit, so typing and widget changes
+    # don't re-execute the script on every keystroke
+    with st.form("extract_form"):
+        # Tab for different input methods
+        input_tab1, input_tab2 = st.tabs(["✍️ Paste Email", "📁 Upload File"])
+
+        with input_tab1:
+            email_text = st.text_area(
+                "Email Content",
+                height=300,
+                placeholder="Paste your email here...\n\nExample:\nHi team,\nSarah - please finish the Q1 report by March 15th.\nJohn should review the code by end of week.\n...",
+                help="Copy and paste the full email body"
+            )
+
+            sender = st.text_input(
+                "From (optional)",
+                placeholder="sender@company.com",
+                help="Email sender - helps with context"
+            )
+
+        with input_tab2:
+            uploaded_files = st.file_uploader(
+                "Upload email files (.txt, .eml)",
+                type=['txt', 'eml'],
+                accept_multiple_files=True,
+                help="Upload one or more text files containing emails"
+            )
+
+            if uploaded_files:
+                uploaded_texts = [text for text in map(read_uploaded_email, uploaded_files)
+                                  if text is not None]
+                if uploaded_texts:
+                    email_text = uploaded_texts[0]
+                sender = st.text_input("From (optional)", key="file_sender")
+
+        extract_button = st.form_submit_button("🚀 Extract Tasks", type="primary",
+                                               use_container_width=True)
     
     # Sample email option
     if st.checkbox("📝 Load sample email"):
@@ -174,17 +311,29 @@ with col2:
     if extract_button and email_text:
         with st.spinner("🤖 AI is analyzing your email..."):
             try:
-                result = process_email(email_text, sender)
+                if len(uploaded_texts) > 1:
+                    # Overlap the per-email API calls; duplicate emails are
+                    # served from the extraction cache without a request
+                    results = process_emails_parallel(
+                        [(text, sender) for text in uploaded_texts],
+                        auto_approve_threshold=confidence_threshold
+                    )
+                    result = combine_results(results)
+                else:
+                    result = process_email(email_text, sender,
+                                           auto_approve_threshold=confidence_threshold)
                 
                 if result['success']:
                     st.session_state.processed_tasks = result
                     
-                    # Add to history
+                    # Add to history and bump the running counters
                     st.session_state.extraction_history.append({
                         'timestamp': datetime.now(),
                         'tasks': result['processed_tasks'],
                         'sender': sender
                     })
+                    st.session_state.history_email_count += 1
+                    st.session_state.history_task_count += len(result['processed_tasks'])
                     
                     st.success(f"✅ Successfully extracted {len(result['processed_tasks'])} tasks!")
                 else:
@@ -206,62 +355,10 @@ with col2:
         
         st.markdown("---")
         
-        # Task list
+        # Task list — each task renders in its own fragment so editing one
+        # doesn't rebuild the others
         for i, task in enumerate(result['processed_tasks'], 1):
-            confidence = task['confidence_metrics']['final_confidence']
-            
-            # Color-coded container based on confidence
-            if confidence >= confidence_threshold:
-                emoji = "🟢"
-                box_class = "success-box"
-                status = "Auto-Approved"
-            elif confidence >= 0.5:
-                emoji = "🟡"
-                box_class = "warning-box"
-                status = "Needs Review"
-            else:
-                emoji = "🔴"
-                box_class = "danger-box"
-                status = "Urgent Review"
-            
-            with st.expander(f"{emoji} Task {i}: {task['task_description']}", expanded=True):
-                # Task details
-                col_a, col_b, col_c = st.columns(3)
-                
-                with col_a:
-                    st.markdown(f"**Assignee:**")
-                    st.text(task['assignee'])
-                
-                with col_b:
-                    st.markdown(f"**Deadline:**")
-                    st.text(task.get('deadline', 'Not specified'))
-                
-                with col_c:
-                    st.markdown(f"**Priority:**")
-                    st.text(task['priority'].title())
-                
-                # Confidence details
-                st.markdown(f"**Confidence:** {confidence:.0%} ({status})")
-                st.progress(confidence)
-                
-                # Show reasoning
-                with st.expander("🔍 AI Reasoning"):
-                    st.info(task.get('reasoning', 'No reasoning provided'))
-                    
-                    if task['confidence_metrics']['adjustments']:
-                        st.warning("Adjustments: " + ", ".join(task['confidence_metrics']['adjustments']))
-                
-                # Edit options
-                with st.form(f"edit_form_{i}"):
-                    st.markdown("**Edit Task:**")
-                    edited_desc = st.text_input("Description", value=task['task_description'])
-                    edited_assignee = st.text_input("Assignee", value=task['assignee'])
-                    edited_deadline = st.text_input("Deadline", value=task.get('deadline', ''))
-                    edited_priority = st.selectbox("Priority", ['high', 'medium', 'low'], 
-                                                   index=['high', 'medium', 'low'].index(task['priority']))
-                    
-                    if st.form_submit_button("✅ Update Task"):
-                        st.success("Task updated! (In production, this would save to database)")
+            render_task(i, task, confidence_threshold)
         
         st.markdown("---")
         
@@ -273,12 +370,13 @@ with col2:
         
         # Export options
         st.markdown("### 📤 Export Options")
-        
+
+        json_data, csv_data, markdown_output = build_exports(json_dumps(result))
+
         col_exp1, col_exp2, col_exp3 = st.columns(3)
-        
+
         with col_exp1:
             # Export as JSON
-            json_data = json.dumps(result, indent=2, default=str)
             st.download_button(
                 label="📄 Download JSON",
                 data=json_data,
@@ -289,16 +387,6 @@ with col2:
         
         with col_exp2:
             # Export as CSV
-            tasks_df = pd.DataFrame([{
-                'Task': t['task_description'],
-                'Assignee': t['assignee'],
-                'Deadline': t.get('deadline', ''),
-                'Priority': t['priority'],
-                'Confidence': f"{t['confidence_metrics']['final_confidence']:.2f}",
-                'Status': t['review_status']
-            } for t in result['processed_tasks']])
-            
-            csv_data = tasks_df.to_csv(index=False)
             st.download_button(
                 label="📊 Download CSV",
                 data=csv_data,
@@ -309,14 +397,6 @@ with col2:
         
         with col_exp3:
             # Copy to clipboard (markdown format)
-            markdown_output = "# Extracted Tasks\n\n"
-            for i, task in enumerate(result['processed_tasks'], 1):
-                markdown_output += f"## Task {i}: {task['task_description']}\n"
-                markdown_output += f"- **Assignee:** {task['assignee']}\n"
-                markdown_output += f"- **Deadline:** {task.get('deadline', 'TBD')}\n"
-                markdown_output += f"- **Priority:** {task['priority']}\n"
-                markdown_output += f"- **Confidence:** {task['confidence_metrics']['final_confidence']:.0%}\n\n"
-            
             st.download_button(
                 label="📋 Download Markdown",
                 data=markdown_output,
@@ -334,3 +414,9 @@ st.markdown("""
     <p>Built with ❤️ using Claude AI | Confidence threshold can be adjusted in sidebar</p>
 </div>
 """, unsafe_allow_html=True)
+
+if _profiler is not None:
+    _profiler.stop()
+    import streamlit.components.v1 as components
+    with st.expander("🔬 Profile (this rerun)", expanded=False):
+        components.html(_profiler.output_html(), height=800, scrolling=True)
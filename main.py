@@ -2,8 +2,7 @@
 Interactive CLI for Email Task Extraction
 Run this to process emails and view results
 """
-import json
-from task_extractor import process_email
+from task_extractor import json_dumps, process_email
 
 
 def print_separator():
@@ -150,7 +149,7 @@ Manager, Product Team
             if save == 'y':
                 filename = f"extraction_result_{result['extraction_result']['extraction_timestamp'].replace(':', '-')}.json"
                 with open(filename, 'w') as f:
-                    json.dump(result, f, indent=2, default=str)
+                    f.write(json_dumps(result, indent=True))
                 print(f"✅ Saved to {filename}")
             
         except Exception as e:
@@ -0,0 +1,25 @@
+"""
+Email Task Extractor - Batch Confidence Scoring
+JIT-compiled penalty arithmetic for very large extractions
+"""
+import numpy as np
+
+try:
+    from numba import njit
+
+    # The pinned signature compiles at import (cached on disk afterwards)
+    # so the first extraction inside a request never pays JIT cost
+    @njit("float64[:](float64[:], float64[:], float64[:], float64[:])",
+          cache=True)
+    def score_batch(llm, no_deadline, unassigned, vague):
+        """Apply rule penalties and clip final confidence to [0, 1]"""
+        penalties = 0.15 * no_deadline + 0.20 * unassigned + 0.10 * vague
+        return np.minimum(np.maximum(llm - penalties, 0.0), 1.0)
+
+except ImportError:
+    # Plain NumPy is already vectorized; numba just shaves the remaining
+    # temporaries and dispatch overhead on very large batches
+    def score_batch(llm, no_deadline, unassigned, vague):
+        """Apply rule penalties and clip final confidence to [0, 1]"""
+        penalties = 0.15 * no_deadline + 0.20 * unassigned + 0.10 * vague
+        return np.clip(llm - penalties, 0.0, 1.0)